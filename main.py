@@ -13,13 +13,26 @@ Architecture:
 
 import os
 import json
+import asyncio
+import hashlib
 import logging
-from datetime import datetime
+import re
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
+import aiofiles
+import aiofiles.os
+import orjson
+import zstandard as zstd
 from pydantic import BaseModel, Field
 from fastapi import FastAPI, HTTPException
-from anthropic import Anthropic
+from fastapi.responses import StreamingResponse
+from anthropic import AsyncAnthropic
 
 # Setup logging
 logging.basicConfig(
@@ -28,15 +41,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup checks: confirm the shared system prefix is long enough to be cached"""
+    await check_prompt_cache_prefix()
+    yield
+
+
 # Initialize FastAPI
 app = FastAPI(
     title="IRIS - Drafting & Composition Agent",
     description="Transforms ideas into structured outlines and authentic drafts",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Initialize Anthropic
-anthropic = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+anthropic = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+
+# Cap in-flight Claude calls to stay within Anthropic rate limits
+MAX_CONCURRENT_GENERATIONS = int(os.getenv("IRIS_MAX_CONCURRENCY", "4"))
+generation_semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+# Token budgets: outlines are 4 sections x up to 4 points x ~40 tokens plus
+# hook/closing/JSON overhead; drafts scale with target length (~1.7 tokens/word)
+OUTLINE_MAX_TOKENS = 4 * 4 * 40 + 500
+DRAFT_MAX_TOKENS = 3000
+
+# Maximum ideas accepted per batch request
+MAX_BATCH_SIZE = int(os.getenv("IRIS_MAX_BATCH_SIZE", "8"))
 
 # Data directory
 data_dir_env = os.getenv("MNEMOSYNE_DATA_DIR")
@@ -48,10 +82,33 @@ else:
 VOICEPRINT_PATH = DATA_DIR / "voiceprint.json"
 DRAFTS_DIR = DATA_DIR / "drafts"
 OUTLINES_DIR = DATA_DIR / "outlines"
+CACHE_DIR = DATA_DIR / "cache"
+
+# Response cache TTL in seconds (default 7 days)
+CACHE_TTL_SECONDS = int(os.getenv("IRIS_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Matches a JSON object inside an optional ```json fence
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.S)
+_JSON_ARRAY_FENCE = re.compile(r"```(?:json)?\s*(\[.*?\])\s*```", re.S)
+
+# Whitespace-delimited word, for counting without building a token list
+_WORD = re.compile(r"\S+")
+
+# Voice scoring patterns; a scored word must contain a letter or digit
+_SCORED_WORD = re.compile(r"\S*\w\S*")
+_SENTENCE = re.compile(r"(?:[^.!?\n]|[.!?](?=\S))+[.!?]*")
+_HEDGE = re.compile(
+    r"\b(?:might|maybe|perhaps|possibly|arguably|somewhat|seems?|"
+    r"sort of|kind of|i think|i guess|to some extent)\b",
+    re.I
+)
+_NUMBER = re.compile(r"\d[\d,.]*%?")
 
 # Ensure directories exist
 DRAFTS_DIR.mkdir(parents=True, exist_ok=True)
 OUTLINES_DIR.mkdir(parents=True, exist_ok=True)
+(CACHE_DIR / "outline").mkdir(parents=True, exist_ok=True)
+(CACHE_DIR / "draft").mkdir(parents=True, exist_ok=True)
 
 
 # ============================================================================
@@ -101,6 +158,22 @@ class DraftResponse(BaseModel):
     created_at: str
     metadata: Dict
 
+class ComposeResponse(BaseModel):
+    """Outline and draft generated in one pipeline call"""
+    outline: OutlineResponse
+    draft: DraftResponse
+
+class BatchItemError(BaseModel):
+    """Failed item in a batch request"""
+    index: int
+    idea_title: str
+    detail: str
+
+class BatchOutlineResponse(BaseModel):
+    """Outlines generated for a batch of ideas"""
+    outlines: List[OutlineResponse]
+    errors: List[BatchItemError]
+
 
 # ============================================================================
 # VoicePrint System
@@ -111,7 +184,37 @@ class VoicePrint:
 
     def __init__(self, voiceprint_path: Path):
         self.voiceprint_path = voiceprint_path
+        self._mtime_ns = self._current_mtime_ns()
         self.params = self._load_voiceprint()
+        self._voice_prompt = self._build_voice_prompt(self.params)
+
+    def reload(self) -> bool:
+        """
+        Re-read voiceprint.json if it changed; returns True if reloaded
+
+        Parses and builds the new prompt before touching any state, so an
+        invalid file raises and leaves the current voice (and mtime) in place
+        for the next attempt.
+        """
+        mtime_ns = self._current_mtime_ns()
+        if mtime_ns == self._mtime_ns:
+            return False
+
+        params = self._load_voiceprint()
+        voice_prompt = self._build_voice_prompt(params)
+
+        self.params = params
+        self._voice_prompt = voice_prompt
+        self._mtime_ns = mtime_ns
+        logger.info(f"✓ Reloaded VoicePrint from {self.voiceprint_path}")
+        return True
+
+    def _current_mtime_ns(self) -> Optional[int]:
+        """VoicePrint file mtime, or None if missing"""
+        try:
+            return self.voiceprint_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
 
     def _load_voiceprint(self) -> Dict:
         """Load VoicePrint from JSON"""
@@ -119,8 +222,7 @@ class VoicePrint:
             logger.warning(f"VoicePrint not found at {self.voiceprint_path}, using defaults")
             return self._get_default_voiceprint()
 
-        with open(self.voiceprint_path, 'r') as f:
-            return json.load(f)
+        return orjson.loads(self.voiceprint_path.read_bytes())
 
     def _get_default_voiceprint(self) -> Dict:
         """Default VoicePrint parameters"""
@@ -138,10 +240,14 @@ class VoicePrint:
         }
 
     def get_voice_prompt(self) -> str:
+        """Voice prompt for Claude (built once on load)"""
+        return self._voice_prompt
+
+    def _build_voice_prompt(self, params: Dict) -> str:
         """Generate voice prompt for Claude"""
-        vp = self.params.get("voice_parameters", {})
-        sp = self.params.get("structure_preferences", {})
-        examples = self.params.get("example_snippets", {})
+        vp = params.get("voice_parameters", {})
+        sp = params.get("structure_preferences", {})
+        examples = params.get("example_snippets", {})
 
         prompt = f"""# Voice Parameters
 
@@ -171,29 +277,311 @@ voiceprint = VoicePrint(VOICEPRINT_PATH)
 
 
 # ============================================================================
-# Content Generation
+# Voice Scoring
 # ============================================================================
 
-def generate_outline(idea: IdeaInput) -> OutlineResponse:
-    """Generate structured outline from idea"""
+# Target shape of the voice: ~18-word sentences with real length variation,
+# few hedges, and concrete numbers (per the VoicePrint writing patterns)
+TARGET_SENTENCE_WORDS = 18.0
+TARGET_SENTENCE_VARIATION = 0.5
+MAX_HEDGES_PER_100_WORDS = 2.0
+TARGET_NUMBERS_PER_100_WORDS = 2.0
 
-    # Get content URL
-    content_url = idea.url or idea.source_url or ""
-    content_summary = idea.content or idea.context or ""
+VOICE_FEATURE_WEIGHTS = (0.25, 0.25, 0.3, 0.2)
 
-    # Build outline prompt
-    prompt = f"""You are IRIS, a drafting agent that creates structured outlines for LinkedIn posts.
 
-{voiceprint.get_voice_prompt()}
+def extract_voice_features(text: str) -> tuple:
+    """
+    Return (avg sentence words, sentence length variation, hedges per 100
+    words, numbers per 100 words) for a draft
+    """
+    lengths = [
+        sum(1 for _ in _SCORED_WORD.finditer(m.group()))
+        for m in _SENTENCE.finditer(text)
+    ]
+    lengths = [n for n in lengths if n]
+    if not lengths:
+        return 0.0, 0.0, 0.0, 0.0
+
+    total_words = sum(lengths)
+    mean = total_words / len(lengths)
+    variance = sum((n - mean) ** 2 for n in lengths) / len(lengths)
+    per_100 = 100.0 / total_words
+
+    return (
+        mean,
+        (variance ** 0.5) / mean,
+        sum(1 for _ in _HEDGE.finditer(text)) * per_100,
+        sum(1 for _ in _NUMBER.finditer(text)) * per_100
+    )
+
+
+def score_voice(text: str) -> float:
+    """Score a draft 0-1 against the VoicePrint writing patterns"""
+    avg_len, variation, hedges, numbers = extract_voice_features(text)
+    if not avg_len:
+        return 0.0
+
+    components = (
+        max(0.0, 1 - abs(avg_len - TARGET_SENTENCE_WORDS) / TARGET_SENTENCE_WORDS),
+        min(variation / TARGET_SENTENCE_VARIATION, 1.0),
+        max(0.0, 1 - hedges / MAX_HEDGES_PER_100_WORDS),
+        min(numbers / TARGET_NUMBERS_PER_100_WORDS, 1.0)
+    )
+
+    return round(sum(w * c for w, c in zip(VOICE_FEATURE_WEIGHTS, components)), 2)
 
-# Task
-Create a structured outline for a LinkedIn post about this idea:
 
-**Title**: {idea.title}
-**Source**: {content_url}
-**Summary**: {content_summary[:500]}
+# ============================================================================
+# Record Store
+# ============================================================================
+
+# Outlines and drafts are stored as zstd-compressed JSON; plain .json files
+# written before compression was introduced are still readable
+RECORD_SUFFIX = ".json.zst"
+LEGACY_RECORD_SUFFIX = ".json"
+
+_zstd_compressor = zstd.ZstdCompressor(level=3)
+_zstd_decompressor = zstd.ZstdDecompressor()
+
+# Parsed outlines are memoized as their immutable JSON bytes, newest last
+OUTLINE_MEMO_SIZE = 512
+_outline_memo: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def encode_record(data: Dict) -> bytes:
+    """Serialize a record as zstd-compressed JSON"""
+    return _zstd_compressor.compress(orjson.dumps(data))
+
+
+async def read_record(path: Path) -> bytes:
+    """Read a record's JSON bytes without blocking the event loop"""
+    async with aiofiles.open(path, 'rb') as f:
+        raw = await f.read()
+    if path.name.endswith(RECORD_SUFFIX):
+        # Records are a few KB; decompressing inline is cheaper than a thread hop
+        raw = _zstd_decompressor.decompress(raw)
+    return raw
+
+
+async def atomic_write(path: Path, data: bytes) -> None:
+    """Write to a temp file and rename it into place, so readers never see a partial file"""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        async with aiofiles.open(tmp_path, 'wb') as f:
+            await f.write(data)
+        await aiofiles.os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def record_id_from_name(name: str, prefix: str) -> Optional[str]:
+    """Extract a record ID from a filename, or None if it isn't a record"""
+    if not name.startswith(prefix):
+        return None
+    for suffix in (RECORD_SUFFIX, LEGACY_RECORD_SUFFIX):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return None
+
+
+async def find_record(directory: Path, record_id: str) -> Optional[Path]:
+    """Locate a record file, preferring the compressed format"""
+    for suffix in (RECORD_SUFFIX, LEGACY_RECORD_SUFFIX):
+        path = directory / f"{record_id}{suffix}"
+        if await aiofiles.os.path.exists(path):
+            return path
+    return None
+
+
+async def write_record(directory: Path, record_id: str, data: Dict) -> None:
+    """Persist a record as compressed JSON"""
+    await atomic_write(directory / f"{record_id}{RECORD_SUFFIX}", encode_record(data))
+
+
+async def load_outline(outline_id: str) -> Optional[Dict]:
+    """
+    Load a saved outline, or None if it doesn't exist
+
+    Outlines are write-once, so the memo is never invalidated. It holds
+    bytes rather than dicts, so warm hits skip disk and decompression but
+    still pay one orjson parse: that parse is the price of giving every
+    caller its own copy, so a mutation can't leak into later draft prompts.
+    """
+    raw = _outline_memo.get(outline_id)
+    if raw is None:
+        outline_path = await find_record(OUTLINES_DIR, outline_id)
+        if outline_path is None:
+            return None
+        raw = await read_record(outline_path)
+        _outline_memo[outline_id] = raw
+        if len(_outline_memo) > OUTLINE_MEMO_SIZE:
+            _outline_memo.popitem(last=False)
+    else:
+        _outline_memo.move_to_end(outline_id)
+
+    return orjson.loads(raw)
+
+
+# ============================================================================
+# Draft Index
+# ============================================================================
+
+# Newest-first (draft_id, mtime) pairs, keyed by drafts directory mtime
+_drafts_index: Dict = {"dir_mtime_ns": None, "entries": []}
+
+
+def scan_drafts() -> List[tuple]:
+    """Return (draft_id, mtime) pairs newest first, rescanning only on change"""
+    dir_mtime_ns = DRAFTS_DIR.stat().st_mtime_ns
+    if _drafts_index["dir_mtime_ns"] == dir_mtime_ns:
+        return _drafts_index["entries"]
+
+    with os.scandir(DRAFTS_DIR) as it:
+        entries = [
+            (draft_id, e.stat().st_mtime)
+            for e in it
+            if (draft_id := record_id_from_name(e.name, "draft_"))
+        ]
+    entries.sort(key=lambda e: e[1], reverse=True)
+
+    _drafts_index["dir_mtime_ns"] = dir_mtime_ns
+    _drafts_index["entries"] = entries
+    return entries
+
+
+def invalidate_drafts_index() -> None:
+    """Force the next scan_drafts() call to rescan the directory"""
+    _drafts_index["dir_mtime_ns"] = None
+
+
+# ============================================================================
+# Response Cache
+# ============================================================================
+
+def make_cache_key(*parts) -> str:
+    """
+    SHA256 of the canonicalized generation inputs
+
+    Includes a fingerprint of the model and system prompt, so a VoicePrint
+    reload or instruction change stops serving responses written in the old
+    voice.
+    """
+    canonical = json.dumps([prompt_fingerprint(), *parts], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def prompt_fingerprint() -> str:
+    """Hash of the model and current system prompt"""
+    return _prompt_fingerprint(voiceprint.get_voice_prompt())
+
+
+@lru_cache(maxsize=4)
+def _prompt_fingerprint(voice_prompt: str) -> str:
+    """Compute the prompt fingerprint once per voice prompt"""
+    system_text = _system_blocks(voice_prompt)[0]["text"]
+    return hashlib.sha256(f"{CLAUDE_MODEL}\n{system_text}".encode('utf-8')).hexdigest()
+
+
+async def discard_cached_response(cache_path: Path) -> None:
+    """Delete a cache entry, ignoring one that is already gone"""
+    try:
+        await aiofiles.os.remove(cache_path)
+    except FileNotFoundError:
+        pass
+
+
+async def load_cached_response(kind: str, cache_key: str) -> Optional[Dict]:
+    """Return a cached response if present, readable and within TTL"""
+    cache_path = CACHE_DIR / kind / f"{cache_key}.json"
+    try:
+        stat = await aiofiles.os.stat(cache_path)
+        if time.time() - stat.st_mtime > CACHE_TTL_SECONDS:
+            await discard_cached_response(cache_path)
+            return None
+
+        async with aiofiles.open(cache_path, 'rb') as f:
+            return orjson.loads(await f.read())
 
-# Outline Structure (Define → Contrast → Synthesize → Project)
+    except FileNotFoundError:
+        return None
+    except orjson.JSONDecodeError as e:
+        logger.warning(f"Discarding unreadable cache entry {cache_path.name}: {e}")
+        await discard_cached_response(cache_path)
+        return None
+
+
+async def store_cached_response(kind: str, cache_key: str, data: Dict) -> None:
+    """Persist a response under its cache key"""
+    cache_path = CACHE_DIR / kind / f"{cache_key}.json"
+    await atomic_write(cache_path, orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+
+# ============================================================================
+# Prompt Templates
+# ============================================================================
+
+# Everything static below is joined into one system block shared by every
+# outline and draft call (see build_system_blocks); per-request prompts carry
+# only the idea fields and options. Keep the shared block above
+# CACHE_MIN_TOKENS or Anthropic silently skips caching it.
+
+IRIS_PERSONA = """You are IRIS, a drafting agent that creates structured outlines and authentic LinkedIn posts.
+
+Each request names its mode. Follow the Outline Mode instructions when asked for an outline and the Draft Mode instructions when asked to write a post; the voice parameters and section guide apply to both."""
+
+SECTION_GUIDE = """# Section Guide
+
+**Hook**: The opening line. It grabs attention with a question or an insight, and must be punchy and specific. In a draft it is the first line of the post, with no title or heading before it.
+
+**Define**: What is this? State the core concept or development behind the idea, using specific numbers and concrete examples from the source where available.
+
+**Contrast**: How is this different? Explain what is changing compared with what came before.
+
+**Synthesize**: Why does this matter? Draw out the implications.
+
+**Project**: What's next? Give an actionable takeaway.
+
+**Closing**: A clear call-to-action or a thought-provoking statement. In a draft the closing is actionable.
+
+# Shared Writing Requirements
+- Use specific numbers and concrete examples
+- Make clear assertions, avoid hedging
+- Prefer active voice
+- Mix short punchy sentences with longer analytical ones
+- Maintain the analytical + conversational tone set in the voice parameters
+- Apply the voice parameters, common phrases and example snippets above to both outlines and drafts
+
+# Input Fields
+Each request provides:
+- **Title**: the idea's headline
+- **Source**: the URL of the source material (may be empty)
+- **Summary**: up to 500 characters of source content (may be empty)
+
+Draft requests also provide the outline (or a note that none exists), a target length in words, and whether hashtags are requested.
+
+# Outline JSON Fields
+- `hook`: a single string
+- `sections`: four objects in the order Define, Contrast, Synthesize, Project; each has a `heading` (the section name) and `key_points` (2-4 strings)
+- `closing`: a single string
+
+Return the JSON object (for batch requests, a JSON array of these objects in request order), optionally inside one ```json fence.
+
+# Draft Output
+- Write the complete post as plain text, with blank lines between paragraphs
+- When an outline is provided, follow its sections and key points in order; otherwise generate the Define → Contrast → Synthesize → Project structure as you write
+- Aim for the requested target length
+- NO bullet points or numbered lists
+- Add 1-2 relevant hashtags at the end only when hashtags are requested
+"""
+
+OUTLINE_INSTRUCTIONS = """# Outline Mode
+
+## Outline Structure (Define → Contrast → Synthesize → Project)
 
 1. **Hook** - Opening line that grabs attention (question or insight)
 2. **Define** - What is this? Core concept/development
@@ -202,79 +590,228 @@ Create a structured outline for a LinkedIn post about this idea:
 5. **Project** - What's next? Actionable takeaway
 6. **Closing** - Clear call-to-action or thought-provoking statement
 
-# Requirements
+## Requirements
 - Hook must be punchy and specific
 - Each section needs 2-4 concrete key points
 - Use specific numbers where available
 - Maintain analytical + conversational tone
 - Target: 800 words final draft
 
-Output format (JSON):
-{{
+## Output format (JSON)
+{
   "hook": "...",
   "sections": [
-    {{"heading": "Define", "key_points": ["...", "..."]}},
-    {{"heading": "Contrast", "key_points": ["...", "..."]}},
-    {{"heading": "Synthesize", "key_points": ["...", "..."]}},
-    {{"heading": "Project", "key_points": ["...", "..."]}}
+    {"heading": "Define", "key_points": ["...", "..."]},
+    {"heading": "Contrast", "key_points": ["...", "..."]},
+    {"heading": "Synthesize", "key_points": ["...", "..."]},
+    {"heading": "Project", "key_points": ["...", "..."]}
   ],
   "closing": "..."
-}}
+}
 """
 
-    logger.info(f"Generating outline for: {idea.title}")
+DRAFT_INSTRUCTIONS = """# Draft Mode
 
-    # Call Claude
+## Requirements
+- Follow Define → Contrast → Synthesize → Project structure
+- Use specific numbers and concrete examples
+- Mix short punchy sentences with longer analytical ones
+- Make clear assertions, avoid hedging language
+- Include 1-2 relevant hashtags at end ONLY if requested
+- Write in active voice
+- Maintain analytical + conversational tone
+
+## Format
+- Start with the hook (no title/heading)
+- Use paragraph breaks for readability (blank lines)
+- NO bullet points or numbered lists in the final draft
+- End with actionable closing
+"""
+
+
+# Anthropic only caches prefixes of at least this many tokens (Sonnet)
+CACHE_MIN_TOKENS = 1024
+
+
+def build_system_blocks() -> List[Dict]:
+    """
+    Cacheable system prompt for the current VoicePrint
+
+    Outlines and drafts send the same single block (persona, voice, section
+    guide and both instruction sets) so they share one cached prefix that
+    clears CACHE_MIN_TOKENS; a split per-endpoint prefix would not.
+    """
+    return _system_blocks(voiceprint.get_voice_prompt())
+
+
+@lru_cache(maxsize=4)
+def _system_blocks(voice_prompt: str) -> List[Dict]:
+    """Build the system block once per voice prompt"""
+    text = "\n\n".join([IRIS_PERSONA, voice_prompt, SECTION_GUIDE, OUTLINE_INSTRUCTIONS, DRAFT_INSTRUCTIONS])
+    return [
+        {
+            "type": "text",
+            "text": text,
+            "cache_control": {"type": "ephemeral"}
+        }
+    ]
+
+
+async def check_prompt_cache_prefix() -> None:
+    """Warn if the shared system prefix is too short for Anthropic to cache"""
     try:
-        message = anthropic.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
-            temperature=0.7,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
+        result = await anthropic.messages.count_tokens(
+            model=CLAUDE_MODEL,
+            system=build_system_blocks(),
+            messages=[{"role": "user", "content": "."}]
         )
+    except Exception as e:
+        logger.warning(f"Could not count system prompt tokens: {e}")
+        return
 
-        # Extract JSON from response
-        response_text = message.content[0].text
+    if result.input_tokens < CACHE_MIN_TOKENS:
+        logger.warning(
+            f"System prompt is {result.input_tokens} tokens, below the "
+            f"{CACHE_MIN_TOKENS}-token cache minimum; prompt caching is inactive"
+        )
+    else:
+        logger.info(f"✓ System prompt is {result.input_tokens} tokens (cacheable)")
 
-        # Try to extract JSON (Claude might wrap it in markdown)
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
-        else:
-            json_str = response_text
 
-        outline_data = json.loads(json_str)
+def idea_fields(idea: IdeaInput) -> tuple:
+    """Return (source URL, summary truncated for prompts) for an idea"""
+    content_url = idea.url or idea.source_url or ""
+    content_summary = idea.content or idea.context or ""
+    return content_url, content_summary[:500]
+
+
+def render_idea(idea: IdeaInput) -> str:
+    """Render the idea fields shared by outline and draft prompts"""
+    content_url, content_summary = idea_fields(idea)
+    return f"""**Title**: {idea.title}
+**Source**: {content_url}
+**Summary**: {content_summary}"""
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-delimited words in a single scan"""
+    return sum(1 for _ in _WORD.finditer(text))
+
+
+# Last issued timestamp, so IDs stay unique when saved in the same microsecond
+_last_timestamp: Dict = {"value": None}
+
 
-        # Create outline response
-        outline_id = f"outline_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+def make_timestamp() -> tuple:
+    """Return (id_suffix, created_at) from a single UTC clock read"""
+    now = datetime.now(timezone.utc)
+    last = _last_timestamp["value"]
+    if last is not None and now <= last:
+        now = last + timedelta(microseconds=1)
+    _last_timestamp["value"] = now
+    return f"{now:%Y%m%d_%H%M%S}_{now.microsecond:06d}", now.isoformat()
 
-        sections = [
-            OutlineSection(
-                heading=section["heading"],
-                key_points=section["key_points"]
+
+def was_truncated(message) -> bool:
+    """True if Claude stopped because it hit max_tokens"""
+    return message.stop_reason == "max_tokens"
+
+
+def log_cache_usage(label: str, message) -> None:
+    """Log prompt cache hits vs writes for a Claude response"""
+    usage = message.usage
+    logger.info(
+        f"{label} tokens - input: {usage.input_tokens}, "
+        f"cache read: {getattr(usage, 'cache_read_input_tokens', 0) or 0}, "
+        f"cache write: {getattr(usage, 'cache_creation_input_tokens', 0) or 0}"
+    )
+
+
+# ============================================================================
+# Content Generation
+# ============================================================================
+
+def outline_cache_key(idea: IdeaInput) -> str:
+    """Response cache key for an outline request"""
+    return make_cache_key(idea.title.strip().lower(), *idea_fields(idea))
+
+
+def extract_json(response_text: str, pattern: re.Pattern):
+    """Parse JSON from a response, unwrapping a markdown fence if present"""
+    match = pattern.search(response_text)
+    json_str = match.group(1) if match else response_text
+    return orjson.loads(json_str)
+
+
+def build_outline(idea: IdeaInput, outline_data: Dict) -> OutlineResponse:
+    """Validate parsed Claude output into an OutlineResponse (raises if malformed)"""
+    id_suffix, created_at = make_timestamp()
+    outline_id = f"outline_{id_suffix}"
+
+    # Nested sections are validated by pydantic-core in one pass
+    outline = OutlineResponse.model_validate({
+        "outline_id": outline_id,
+        "idea_title": idea.title,
+        "hook": outline_data["hook"],
+        "sections": outline_data["sections"],
+        "closing": outline_data["closing"],
+        "word_count_estimate": 800,
+        "created_at": created_at
+    })
+
+    return outline
+
+
+async def persist_outline(outline: OutlineResponse, cache_key: str) -> None:
+    """Save a validated outline and cache it under its request key"""
+    outline_id = outline.outline_id
+    record = outline.model_dump()
+    await write_record(OUTLINES_DIR, outline_id, record)
+
+    await store_cached_response("outline", cache_key, record)
+
+    logger.info(f"✓ Created outline: {outline_id}")
+
+
+async def generate_outline(idea: IdeaInput) -> OutlineResponse:
+    """Generate structured outline from idea"""
+
+    # Short-circuit repeated ideas
+    cache_key = outline_cache_key(idea)
+    cached = await load_cached_response("outline", cache_key)
+    if cached:
+        logger.info(f"✓ Outline cache hit: {cached['outline_id']}")
+        return OutlineResponse.model_validate(cached)
+
+    # Build outline prompt (static parts live in the cached system block)
+    prompt = f"""# Task (Outline Mode)
+Create a structured outline for a LinkedIn post about this idea:
+
+{render_idea(idea)}
+"""
+
+    logger.info(f"Generating outline for: {idea.title}")
+
+    # Call Claude
+    try:
+        async with generation_semaphore:
+            message = await anthropic.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=OUTLINE_MAX_TOKENS,
+                temperature=0.7,
+                system=build_system_blocks(),
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
             )
-            for section in outline_data["sections"]
-        ]
 
-        outline = OutlineResponse(
-            outline_id=outline_id,
-            idea_title=idea.title,
-            hook=outline_data["hook"],
-            sections=sections,
-            closing=outline_data["closing"],
-            word_count_estimate=800,
-            created_at=datetime.now().isoformat()
-        )
+        log_cache_usage("Outline", message)
 
-        # Save outline
-        outline_path = OUTLINES_DIR / f"{outline_id}.json"
-        with open(outline_path, 'w') as f:
-            json.dump(outline.dict(), f, indent=2)
+        if was_truncated(message):
+            raise ValueError(f"response truncated at max_tokens ({OUTLINE_MAX_TOKENS}) before the outline JSON was complete")
 
-        logger.info(f"✓ Created outline: {outline_id}")
+        outline = build_outline(idea, extract_json(message.content[0].text, _JSON_FENCE))
+        await persist_outline(outline, cache_key)
 
         return outline
 
@@ -283,115 +820,281 @@ Output format (JSON):
         raise HTTPException(status_code=500, detail=f"Outline generation failed: {str(e)}")
 
 
-def generate_draft(request: DraftRequest) -> DraftResponse:
-    """Generate full draft from outline or idea"""
+async def generate_outline_batch(ideas: List[IdeaInput]) -> List[Union[OutlineResponse, Exception]]:
+    """
+    Generate outlines for several ideas in a single Claude call
 
-    # Load outline if provided
-    outline = None
-    if request.outline_id:
-        outline_path = OUTLINES_DIR / f"{request.outline_id}.json"
-        if outline_path.exists():
-            with open(outline_path, 'r') as f:
-                outline = json.load(f)
+    Cached ideas are served directly; the rest share one request (and one
+    cached system prefix). Items the combined response doesn't cover
+    validly fall back to per-idea calls; an idea whose retry also fails
+    gets its exception in place of an outline.
+    """
 
-    # Build draft prompt
-    if outline:
-        outline_text = f"""
-**Hook**: {outline['hook']}
+    cache_keys = [outline_cache_key(idea) for idea in ideas]
+    outlines: List[Union[OutlineResponse, Exception, None]] = [None] * len(ideas)
+
+    for index, cache_key in enumerate(cache_keys):
+        cached = await load_cached_response("outline", cache_key)
+        if cached:
+            outlines[index] = OutlineResponse.model_validate(cached)
 
-{chr(10).join([f"**{section['heading']}**:{chr(10)}- " + chr(10) + "- ".join(section['key_points']) for section in outline['sections']])}
+    pending = [index for index, outline in enumerate(outlines) if outline is None]
+    if not pending:
+        return outlines
 
-**Closing**: {outline['closing']}
+    ideas_text = "\n\n".join(
+        f"## Idea {position}\n{render_idea(ideas[index])}"
+        for position, index in enumerate(pending, start=1)
+    )
+    prompt = f"""# Task (Outline Mode)
+Create a structured outline for a LinkedIn post about each of the following {len(pending)} ideas.
+Return a JSON array containing one outline object (in the Outline Mode output format) per idea, in the same order.
+
+{ideas_text}
 """
-    else:
-        outline_text = "No outline provided - generate structure as you write"
 
-    content_url = request.idea.url or request.idea.source_url or ""
-    content_summary = request.idea.content or request.idea.context or ""
+    logger.info(f"Generating {len(pending)} outlines in one batch")
+
+    try:
+        async with generation_semaphore:
+            message = await anthropic.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=OUTLINE_MAX_TOKENS * len(pending),
+                temperature=0.7,
+                system=build_system_blocks(),
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
+    except Exception as e:
+        logger.error(f"Error generating outline batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Outline batch generation failed: {str(e)}")
+
+    log_cache_usage("Outline batch", message)
+
+    try:
+        if was_truncated(message):
+            raise ValueError(f"response truncated at max_tokens ({OUTLINE_MAX_TOKENS * len(pending)})")
+        batch_data = extract_json(message.content[0].text, _JSON_ARRAY_FENCE)
+        if not isinstance(batch_data, list) or len(batch_data) != len(pending):
+            raise ValueError(f"expected {len(pending)} outlines")
+    except Exception as e:
+        logger.warning(f"Outline batch parse failed ({e}), falling back to single-idea calls")
+        batch_data = [None] * len(pending)
+
+    # Validate every item before anything is written
+    failed = []
+    for index, outline_data in zip(pending, batch_data):
+        if outline_data is None:
+            failed.append(index)
+            continue
+        try:
+            outlines[index] = build_outline(ideas[index], outline_data)
+        except Exception as e:
+            logger.warning(f"Invalid batch outline for '{ideas[index].title}' ({e}), retrying singly")
+            failed.append(index)
+
+    try:
+        await asyncio.gather(*(
+            persist_outline(outlines[index], cache_keys[index])
+            for index in pending
+            if index not in failed
+        ))
+    except Exception as e:
+        logger.error(f"Error saving outline batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Outline batch generation failed: {str(e)}")
+
+    # Only the items that failed validation fall back to single-idea calls
+    retried = await asyncio.gather(*(generate_outline(ideas[index]) for index in failed), return_exceptions=True)
+    for index, outline in zip(failed, retried):
+        outlines[index] = outline
+
+    return outlines
 
-    prompt = f"""You are IRIS, a drafting agent that creates authentic LinkedIn posts.
 
-{voiceprint.get_voice_prompt()}
+async def build_draft_prompt(request: DraftRequest) -> str:
+    """Build the per-request user prompt for a draft"""
 
-# Task
+    # Load outline if provided
+    outline = await load_outline(request.outline_id) if request.outline_id else None
+
+    # Build draft prompt
+    if outline:
+        parts = [f"**Hook**: {outline['hook']}", ""]
+        for section in outline['sections']:
+            parts.append(f"**{section['heading']}**:")
+            parts.extend(f"- {point}" for point in section['key_points'])
+            parts.append("")
+        parts.append(f"**Closing**: {outline['closing']}")
+        outline_text = "\n".join(parts)
+    else:
+        outline_text = "No outline provided - generate structure as you write"
+
+    return f"""# Task (Draft Mode)
 Write a complete LinkedIn post based on this outline and source material.
 
-**Topic**: {request.idea.title}
-**Source**: {content_url}
-**Summary**: {content_summary[:500]}
+{render_idea(request.idea)}
 
 # Outline
 {outline_text}
 
-# Requirements
+# Length & Extras
 - Target length: {request.target_length} words
-- Follow Define → Contrast → Synthesize → Project structure
-- Use specific numbers and concrete examples
-- Mix short punchy sentences with longer analytical ones
-- Make clear assertions, avoid hedging language
-- Include 1-2 relevant hashtags at end ONLY if requested: {request.include_hashtags}
-- Write in active voice
-- Maintain analytical + conversational tone
-
-# Format
-- Start with the hook (no title/heading)
-- Use paragraph breaks for readability (blank lines)
-- NO bullet points or numbered lists in the final draft
-- End with actionable closing
+- Include hashtags: {request.include_hashtags}
 
 Write the complete post now:
 """
 
-    logger.info(f"Generating draft for: {request.idea.title}")
 
-    try:
-        message = anthropic.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=3000,
-            temperature=0.7,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+def draft_cache_key(request: DraftRequest) -> str:
+    """Response cache key for a draft request"""
+    return make_cache_key(
+        request.idea.title.strip().lower(),
+        *idea_fields(request.idea),
+        request.outline_id,
+        request.target_length,
+        request.include_hashtags
+    )
+
+
+def draft_max_tokens(target_length: int) -> int:
+    """Token budget for a draft of the given target word count"""
+    return min(DRAFT_MAX_TOKENS, int(target_length * 1.7) + 200)
+
+
+def open_draft_stream(prompt: str, max_tokens: int):
+    """Open a streaming Claude call for a draft prompt"""
+    return anthropic.messages.stream(
+        model=CLAUDE_MODEL,
+        max_tokens=max_tokens,
+        temperature=0.7,
+        stop_sequences=["\n\n\n\n"],
+        system=build_system_blocks(),
+        messages=[
+            {"role": "user", "content": prompt}
+        ]
+    )
 
-        draft_content = message.content[0].text.strip()
-        word_count = len(draft_content.split())
-
-        # Calculate basic voice score (simplified)
-        voice_score = 0.85  # Placeholder - could add NLP analysis
-
-        # Create draft response
-        draft_id = f"draft_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-
-        draft = DraftResponse(
-            draft_id=draft_id,
-            outline_id=request.outline_id,
-            title=request.idea.title,
-            content=draft_content,
-            word_count=word_count,
-            voice_score=voice_score,
-            created_at=datetime.now().isoformat(),
-            metadata={
-                "source_url": content_url,
-                "target_length": request.target_length,
-                "model": "claude-sonnet-4-20250514"
-            }
-        )
 
-        # Save draft
-        draft_path = DRAFTS_DIR / f"{draft_id}.json"
-        with open(draft_path, 'w') as f:
-            json.dump(draft.dict(), f, indent=2)
+async def save_draft(request: DraftRequest, draft_content: str, cache_key: str, truncated: bool = False) -> DraftResponse:
+    """
+    Score, persist and cache a completed draft
+
+    Drafts cut off at max_tokens are saved and returned with
+    metadata.truncated set, but never cached, so a repeat request
+    regenerates instead of replaying the cut-off post.
+    """
+    content_url, _ = idea_fields(request.idea)
+    word_count = count_words(draft_content)
+
+    voice_score = score_voice(draft_content)
+
+    # Create draft response
+    id_suffix, created_at = make_timestamp()
+    draft_id = f"draft_{id_suffix}"
+
+    draft = DraftResponse(
+        draft_id=draft_id,
+        outline_id=request.outline_id,
+        title=request.idea.title,
+        content=draft_content,
+        word_count=word_count,
+        voice_score=voice_score,
+        created_at=created_at,
+        metadata={
+            "source_url": content_url,
+            "target_length": request.target_length,
+            "model": CLAUDE_MODEL,
+            "truncated": truncated
+        }
+    )
+
+    # Save draft
+    record = draft.model_dump()
+    await write_record(DRAFTS_DIR, draft_id, record)
+
+    if truncated:
+        logger.warning(f"Draft {draft_id} hit max_tokens ({draft_max_tokens(request.target_length)}); not caching")
+    else:
+        await store_cached_response("draft", cache_key, record)
+    invalidate_drafts_index()
+
+    logger.info(f"✓ Created draft: {draft_id} ({word_count} words, voice score: {voice_score:.2f})")
+
+    return draft
+
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode()}\n\n"
+
+
+async def generate_draft(request: DraftRequest) -> DraftResponse:
+    """Generate full draft from outline or idea"""
 
-        logger.info(f"✓ Created draft: {draft_id} ({word_count} words, voice score: {voice_score:.2f})")
+    # Short-circuit repeated draft requests
+    cache_key = draft_cache_key(request)
+    cached = await load_cached_response("draft", cache_key)
+    if cached:
+        logger.info(f"✓ Draft cache hit: {cached['draft_id']}")
+        return DraftResponse.model_validate(cached)
 
-        return draft
+    prompt = await build_draft_prompt(request)
+
+    logger.info(f"Generating draft for: {request.idea.title}")
+
+    try:
+        async with generation_semaphore:
+            async with open_draft_stream(prompt, draft_max_tokens(request.target_length)) as stream:
+                message = await stream.get_final_message()
+
+        log_cache_usage("Draft", message)
+
+        return await save_draft(request, message.content[0].text.strip(), cache_key, was_truncated(message))
 
     except Exception as e:
         logger.error(f"Error generating draft: {e}")
         raise HTTPException(status_code=500, detail=f"Draft generation failed: {str(e)}")
 
 
+async def stream_draft(request: DraftRequest) -> AsyncIterator[str]:
+    """
+    Generate draft as Server-Sent Events
+
+    Emits `data: {"delta": ...}` per text chunk, then a terminal `draft`
+    event carrying the saved DraftResponse (or an `error` event).
+    """
+
+    cache_key = draft_cache_key(request)
+    cached = await load_cached_response("draft", cache_key)
+    if cached:
+        logger.info(f"✓ Draft cache hit: {cached['draft_id']}")
+        yield sse_event({"delta": cached["content"]})
+        yield sse_event(cached, event="draft")
+        return
+
+    prompt = await build_draft_prompt(request)
+
+    logger.info(f"Streaming draft for: {request.idea.title}")
+
+    try:
+        async with generation_semaphore:
+            async with open_draft_stream(prompt, draft_max_tokens(request.target_length)) as stream:
+                async for text in stream.text_stream:
+                    yield sse_event({"delta": text})
+                message = await stream.get_final_message()
+
+        log_cache_usage("Draft", message)
+
+        draft = await save_draft(request, message.content[0].text.strip(), cache_key, was_truncated(message))
+        yield sse_event(draft.model_dump(), event="draft")
+
+    except Exception as e:
+        logger.error(f"Error streaming draft: {e}")
+        yield sse_event({"detail": f"Draft generation failed: {str(e)}"}, event="error")
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -407,68 +1110,161 @@ def health_check():
     }
 
 
+@app.post("/v1/voiceprint/reload")
+def reload_voiceprint():
+    """Reload VoicePrint parameters from disk without restarting"""
+    try:
+        reloaded = voiceprint.reload()
+    except orjson.JSONDecodeError as e:
+        logger.error(f"Invalid VoicePrint JSON: {e}")
+        raise HTTPException(status_code=500, detail=f"VoicePrint reload failed: {voiceprint.voiceprint_path} is not valid JSON ({e})")
+    except (AttributeError, TypeError, ValueError) as e:
+        logger.error(f"Invalid VoicePrint parameters: {e}")
+        raise HTTPException(status_code=500, detail=f"VoicePrint reload failed: unexpected structure in {voiceprint.voiceprint_path} ({e})")
+
+    return {
+        "status": "ok",
+        "reloaded": reloaded,
+        "voiceprint_path": str(voiceprint.voiceprint_path)
+    }
+
+
 @app.post("/v1/outlines", response_model=OutlineResponse)
-def create_outline(idea: IdeaInput):
+async def create_outline(idea: IdeaInput):
     """
     Generate structured outline from idea
 
     **Define → Contrast → Synthesize → Project**
     """
-    return generate_outline(idea)
+    return await generate_outline(idea)
 
 
 @app.post("/v1/drafts", response_model=DraftResponse)
-def create_draft(request: DraftRequest):
+async def create_draft(request: DraftRequest):
     """
     Generate full draft from outline or idea
 
     Applies VoicePrint parameters for authentic tone
     """
-    return generate_draft(request)
+    return await generate_draft(request)
+
+
+@app.post("/v1/drafts/stream")
+async def create_draft_stream(request: DraftRequest):
+    """
+    Stream draft generation as Server-Sent Events
+
+    Text deltas arrive as they are generated; the final `draft` event
+    carries the saved DraftResponse
+    """
+    return StreamingResponse(stream_draft(request), media_type="text/event-stream")
+
+
+@app.post("/v1/compose", response_model=ComposeResponse)
+async def compose(idea: IdeaInput):
+    """
+    Generate outline and draft for an idea in a single call
+
+    Saves the client a round-trip between /v1/outlines and /v1/drafts
+    """
+    outline = await generate_outline(idea)
+    draft = await generate_draft(DraftRequest(outline_id=outline.outline_id, idea=idea))
+    return ComposeResponse(outline=outline, draft=draft)
+
+
+def batch_outline_response(ideas: List[IdeaInput], results: List) -> BatchOutlineResponse:
+    """Split per-idea results into outlines (in request order) and errors"""
+    outlines = []
+    errors = []
+    for index, (idea, result) in enumerate(zip(ideas, results)):
+        if isinstance(result, Exception):
+            detail = result.detail if isinstance(result, HTTPException) else str(result)
+            errors.append(BatchItemError(index=index, idea_title=idea.title, detail=detail))
+        else:
+            outlines.append(result)
+
+    return BatchOutlineResponse(outlines=outlines, errors=errors)
+
+
+@app.post("/v1/outlines:batch", response_model=BatchOutlineResponse)
+async def create_outlines_single_call(ideas: List[IdeaInput]):
+    """
+    Generate outlines for several ideas in a single Claude call
+
+    Cheaper than /v1/batch when throughput matters more than per-idea
+    latency. Ideas that still fail after a single-idea retry are reported
+    in `errors`.
+    """
+    if len(ideas) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch size {len(ideas)} exceeds limit of {MAX_BATCH_SIZE}")
+
+    return batch_outline_response(ideas, await generate_outline_batch(ideas))
+
+
+@app.post("/v1/batch", response_model=BatchOutlineResponse)
+async def create_outline_batch(ideas: List[IdeaInput]):
+    """
+    Generate outlines for independent ideas concurrently
+
+    Calls run in parallel, bounded by the generation semaphore. Failed
+    ideas are reported in `errors` without failing the whole batch.
+    """
+    if len(ideas) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch size {len(ideas)} exceeds limit of {MAX_BATCH_SIZE}")
+
+    results = await asyncio.gather(*(generate_outline(idea) for idea in ideas), return_exceptions=True)
+
+    return batch_outline_response(ideas, results)
 
 
 @app.get("/v1/drafts/{draft_id}")
-def get_draft(draft_id: str):
+async def get_draft(draft_id: str):
     """Retrieve specific draft by ID"""
-    draft_path = DRAFTS_DIR / f"{draft_id}.json"
+    draft_path = await find_record(DRAFTS_DIR, draft_id)
 
-    if not draft_path.exists():
+    if draft_path is None:
         raise HTTPException(status_code=404, detail=f"Draft {draft_id} not found")
 
-    with open(draft_path, 'r') as f:
-        return json.load(f)
+    return orjson.loads(await read_record(draft_path))
 
 
 @app.get("/v1/outlines/{outline_id}")
-def get_outline(outline_id: str):
+async def get_outline(outline_id: str):
     """Retrieve specific outline by ID"""
-    outline_path = OUTLINES_DIR / f"{outline_id}.json"
+    outline = await load_outline(outline_id)
 
-    if not outline_path.exists():
+    if outline is None:
         raise HTTPException(status_code=404, detail=f"Outline {outline_id} not found")
 
-    with open(outline_path, 'r') as f:
-        return json.load(f)
+    return outline
 
 
 @app.get("/v1/drafts")
 def list_drafts(limit: int = 20):
     """List recent drafts"""
-    drafts = sorted(DRAFTS_DIR.glob("draft_*.json"), reverse=True)[:limit]
+    entries = scan_drafts()
+    drafts = entries[:limit]
 
     return {
-        "total": len(list(DRAFTS_DIR.glob("draft_*.json"))),
+        "total": len(entries),
         "returned": len(drafts),
         "drafts": [
             {
-                "draft_id": f.stem,
-                "created_at": datetime.fromtimestamp(f.stat().st_mtime).isoformat()
+                "draft_id": draft_id,
+                "created_at": datetime.fromtimestamp(mtime, timezone.utc).isoformat()
             }
-            for f in drafts
+            for draft_id, mtime in drafts
         ]
     }
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8002)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8002,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("IRIS_WORKERS", "1"))
+    )
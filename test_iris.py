@@ -69,3 +69,72 @@ if response.status_code == 200:
 else:
     print(f"\n✗ Outline generation failed: {response.status_code}")
     print(response.text)
+
+
+def report(label, response):
+    """Print pass/fail for an endpoint response"""
+    if response.status_code == 200:
+        print(f"\n✓ {label}")
+        return True
+    print(f"\n✗ {label} failed: {response.status_code}")
+    print(response.text)
+    return False
+
+
+second_idea = {
+    "title": "Stripe acquires stablecoin platform Bridge",
+    "url": "https://www.finextra.com/newsarticle/44860/stripe-acquires-stablecoin-platform-bridge",
+    "context": "Stripe has agreed to buy stablecoin infrastructure startup Bridge for $1.1 billion.",
+    "score": 0.9
+}
+
+# New endpoints
+print("\n" + "=" * 80)
+print("Testing VoicePrint Reload, Streaming, Compose and Batch Endpoints")
+print("=" * 80)
+
+response = requests.post("http://localhost:8002/v1/voiceprint/reload")
+if report("VoicePrint reload", response):
+    print(f"  Reloaded: {response.json()['reloaded']}")
+
+response = requests.post(
+    "http://localhost:8002/v1/drafts/stream",
+    json={"idea": second_idea, "target_length": 400},
+    stream=True
+)
+if report("Draft stream opened", response):
+    deltas = 0
+    final_event = None
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            if event:
+                final_event = (event, json.loads(line[len("data: "):]))
+            else:
+                deltas += 1
+            event = None
+    print(f"  Deltas received: {deltas}")
+    if final_event and final_event[0] == "draft":
+        print(f"  ✓ Final draft: {final_event[1]['draft_id']} ({final_event[1]['word_count']} words)")
+    else:
+        print(f"  ✗ Stream ended without a draft event: {final_event}")
+
+response = requests.post("http://localhost:8002/v1/compose", json=second_idea)
+if report("Compose", response):
+    composed = response.json()
+    print(f"  Outline: {composed['outline']['outline_id']}, draft: {composed['draft']['draft_id']}")
+
+response = requests.post("http://localhost:8002/v1/batch", json=[idea, second_idea])
+if report("Concurrent batch", response):
+    result = response.json()
+    print(f"  Outlines: {len(result['outlines'])}, errors: {len(result['errors'])}")
+
+response = requests.post("http://localhost:8002/v1/outlines:batch", json=[idea, second_idea])
+if report("Single-call outline batch", response):
+    result = response.json()
+    titles = [o["idea_title"] for o in result["outlines"]]
+    if not result["errors"]:
+        assert titles == [idea["title"], second_idea["title"]]
+    print(f"  Outlines: {len(titles)}, errors: {len(result['errors'])}")